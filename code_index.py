@@ -0,0 +1,224 @@
+import os
+import re
+import ast
+import json
+import math
+import hashlib
+import logging
+import chromadb
+from chromadb.config import Settings
+from workspace import walk
+
+# chromadb 0.6.3 still calls posthog with telemetry disabled and logs every
+# failed capture under the pinned posthog; keep that out of the terminal.
+logging.getLogger("chromadb.telemetry").setLevel(logging.CRITICAL)
+
+INDEX_DIR = os.path.join(".teacoder", "index")
+COLLECTION = "code_chunks"
+CODE_EXTENSIONS = {
+    ".py", ".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs", ".vue", ".java", ".rb", ".go", ".rs",
+    ".c", ".h", ".cpp", ".hpp", ".cs", ".php", ".kt", ".swift", ".sql", ".html", ".css", ".md",
+}
+MAX_FILE_BYTES = 512 * 1024
+MAX_CHUNK_LINES = 80
+EMBEDDING_DIM = 512
+TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+CAMEL_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+PREAMBLE_PREFIXES = ("@", "#[", "[", "//", "/*", "*")
+# Lines that open a definition in the common non-Python languages. Leading
+# indentation is allowed so methods inside Java/C#/Kotlin classes and Rust
+# impl blocks get their own chunks.
+MODIFIERS = r"(?:(?:public|private|protected|internal|static|final|abstract|override|virtual|sealed|async|synchronized|open|suspend|inline|unsafe|extern|const|default|export|pub(?:\([^)]*\))?)\s+)"
+BOUNDARY_RE = re.compile(
+    # JS/TS functions, classes and types; Rust/Go/Kotlin/Swift/Ruby/PHP definitions.
+    rf"^\s*{MODIFIERS}*(?:function\*?|class|interface|type|enum|record|struct|trait|impl|mod|module|fn|func|fun|def)\b"
+    # JS/TS functions bound to a name: const f = (...) => / function.
+    rf"|^\s*{MODIFIERS}*(?:const|let|var)\s+\w+\s*=\s*(?:async\s*)?(?:\(|function\b|\w+\s*=>)"
+    # Java/C#/Kotlin/PHP methods: modifiers, optional return type, name(.
+    rf"|^\s*{MODIFIERS}+[\w<>\[\],.?]*(?:\s+[\w<>\[\],.?]+)*\s*\w+\s*\("
+    # C/C++ functions: a type and name( at column 0 that is not a declaration.
+    r"|^[A-Za-z_][\w:<>*&]*(?:\s+[\w:<>*&]+)*\s+[*&]*[\w:~]+\s*\([^;]*$"
+)
+
+
+class HashingEmbedder:
+    """Offline default embedder: hashed bag of identifier sub-tokens.
+
+    Needs no model download or network access. Any callable mapping a list of
+    strings to a list of vectors (e.g. a LangChain ``embed_documents``) can be
+    passed to :class:`CodeIndex` instead.
+    """
+
+    def __init__(self, dim=EMBEDDING_DIM):
+        self.dim = dim
+
+    def _tokens(self, text):
+        for token in TOKEN_RE.findall(text):
+            yield token.lower()
+            parts = [p.lower() for p in CAMEL_RE.findall(token.replace("_", " ")) if p]
+            if len(parts) > 1:
+                yield from parts
+
+    def __call__(self, texts):
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.dim
+            for token in self._tokens(text):
+                digest = hashlib.md5(token.encode("utf-8")).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+            norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+            vectors.append([v / norm for v in vector])
+        return vectors
+
+
+def _split_long(start, end):
+    for offset in range(start, end, MAX_CHUNK_LINES):
+        yield offset, min(offset + MAX_CHUNK_LINES, end)
+
+
+def _python_boundaries(text):
+    definitions = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+    nodes = [node for node in ast.parse(text).body if isinstance(node, definitions)]
+    # Methods get their own chunks so one large class is not cut into blind windows.
+    nodes += [child for node in nodes if isinstance(node, ast.ClassDef)
+              for child in node.body if isinstance(child, definitions)]
+    lines = text.splitlines()
+    boundaries = []
+    for node in nodes:
+        start = min([node.lineno] + [d.lineno for d in node.decorator_list]) - 1
+        # Keep comments directly above a definition with the code they describe.
+        while start > 0 and lines[start - 1].lstrip().startswith("#"):
+            start -= 1
+        boundaries.append(start)
+    return boundaries
+
+
+def _extend_over_preamble(lines, start):
+    # Annotations, attributes and doc comments belong to the definition below.
+    while start > 0 and lines[start - 1].lstrip().startswith(PREAMBLE_PREFIXES):
+        start -= 1
+    return start
+
+
+def chunk_source(rel, text):
+    """Split a file at function/class boundaries into (start, end, text) chunks.
+
+    Line numbers are 1-based and inclusive. Code before the first definition
+    becomes its own chunk and oversized definitions are cut into windows.
+    """
+    lines = text.splitlines()
+    if not lines:
+        return []
+    boundaries = None
+    if rel.endswith(".py"):
+        try:
+            boundaries = _python_boundaries(text)
+        except (SyntaxError, ValueError):
+            boundaries = None
+    if boundaries is None:
+        boundaries = [_extend_over_preamble(lines, i) for i, line in enumerate(lines) if BOUNDARY_RE.match(line)]
+    starts = sorted({0, *boundaries})
+    chunks = []
+    for index, start in enumerate(starts):
+        end = starts[index + 1] if index + 1 < len(starts) else len(lines)
+        for lo, hi in _split_long(start, end):
+            body = "\n".join(lines[lo:hi])
+            if body.strip():
+                chunks.append((lo + 1, hi, body))
+    return chunks
+
+
+class CodeIndex:
+    """Persistent per-workspace vector index of code chunks.
+
+    File state (size, mtime, content hash, chunk ids) is kept next to the
+    Chroma collection so :meth:`update` only rehashes files whose stat changed
+    and only embeds chunks whose text is new.
+    """
+
+    def __init__(self, root=None, embedder=None):
+        self.root = os.path.abspath(root or os.getcwd())
+        self.path = os.path.join(self.root, INDEX_DIR)
+        os.makedirs(self.path, exist_ok=True)
+        self.embedder = embedder or HashingEmbedder()
+        self.state_path = os.path.join(self.path, "files.json")
+        self.client = chromadb.PersistentClient(path=self.path, settings=Settings(anonymized_telemetry=False))
+        self.collection = self.client.get_or_create_collection(COLLECTION, metadata={"hnsw:space": "cosine"})
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as file:
+                self.state = json.load(file)
+        except (OSError, ValueError):
+            self.state = {}
+
+    def _save(self):
+        with open(self.state_path, "w", encoding="utf-8") as file:
+            json.dump(self.state, file)
+
+    def _index_file(self, rel, text, digest, stat):
+        chunks = {}
+        for start, end, body in chunk_source(rel, text):
+            chunk_id = hashlib.sha1(f"{rel}\0{body}".encode("utf-8")).hexdigest()
+            chunks.setdefault(chunk_id, (start, end, body))
+        old_ids = set(self.state.get(rel, {}).get("chunks", []))
+        stale = list(old_ids - chunks.keys())
+        fresh = [chunk_id for chunk_id in chunks if chunk_id not in old_ids]
+        if stale:
+            self.collection.delete(ids=stale)
+        if fresh:
+            documents = [chunks[chunk_id][2] for chunk_id in fresh]
+            self.collection.upsert(
+                ids=fresh,
+                documents=documents,
+                embeddings=self.embedder(documents),
+                metadatas=[{"path": rel, "start": chunks[c][0], "end": chunks[c][1]} for c in fresh],
+            )
+        kept = [chunk_id for chunk_id in chunks if chunk_id in old_ids]
+        if kept:
+            # Unchanged chunks may have shifted lines; refresh their ranges.
+            self.collection.update(
+                ids=kept,
+                metadatas=[{"path": rel, "start": chunks[c][0], "end": chunks[c][1]} for c in kept],
+            )
+        self.state[rel] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "sha": digest, "chunks": list(chunks)}
+        return len(fresh), len(stale)
+
+    def update(self):
+        """Bring the index in line with the workspace; return (embedded, removed) chunk counts."""
+        embedded = removed = 0
+        seen = set()
+        for rel, path, stat in walk(self.root, MAX_FILE_BYTES):
+            if os.path.splitext(rel)[1].lower() not in CODE_EXTENSIONS:
+                continue
+            seen.add(rel)
+            known = self.state.get(rel)
+            if known and known["size"] == stat.st_size and known["mtime"] == stat.st_mtime_ns:
+                continue
+            try:
+                with open(path, "rb") as file:
+                    data = file.read()
+            except OSError:
+                continue
+            digest = hashlib.sha1(data).hexdigest()
+            if known and known["sha"] == digest:
+                known["mtime"] = stat.st_mtime_ns
+                continue
+            added, dropped = self._index_file(rel, data.decode("utf-8", "replace"), digest, stat)
+            embedded += added
+            removed += dropped
+        for rel in [rel for rel in self.state if rel not in seen]:
+            ids = self.state.pop(rel)["chunks"]
+            if ids:
+                self.collection.delete(ids=ids)
+            removed += len(ids)
+        self._save()
+        return embedded, removed
+
+    def query(self, text, k=5):
+        """Return up to k (path, start, end, code) tuples most similar to text."""
+        count = self.collection.count()
+        if not count:
+            return []
+        result = self.collection.query(query_embeddings=self.embedder([text]), n_results=min(k, count))
+        return [(meta["path"], meta["start"], meta["end"], doc)
+                for meta, doc in zip(result["metadatas"][0], result["documents"][0])]
@@ -0,0 +1,108 @@
+import os
+import re
+import mmap
+import fnmatch
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from workspace import walk
+
+BINARY_SNIFF_BYTES = 8192
+MAX_FILE_BYTES = 5 * 1024 * 1024
+SNIPPET_CHARS = 120
+PARALLEL_THRESHOLD = 2000
+BATCH_SIZE = 256
+
+
+def _matches_glob(rel, glob):
+    if not glob or glob == "*":
+        return True
+    if "/" in glob:
+        # A leading "**/" also matches files at the workspace root.
+        if glob.startswith("**/") and _matches_glob(rel, glob[3:]):
+            return True
+        return fnmatch.fnmatch(rel, glob)
+    return fnmatch.fnmatch(os.path.basename(rel), glob)
+
+
+def iter_files(root, glob="*"):
+    """Yield workspace-relative paths of searchable files under root."""
+    for rel, path, stat in walk(root, MAX_FILE_BYTES):
+        if _matches_glob(rel, glob):
+            yield rel
+
+
+def _search_file(root, rel, regex, limit):
+    hits = []
+    try:
+        with open(os.path.join(root, rel), "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size == 0 or size > MAX_FILE_BYTES:
+                return hits
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if b"\0" in data[:BINARY_SNIFF_BYTES]:
+                    return hits
+                raw = data[:]
+    except (OSError, ValueError):
+        return hits
+    # Match on decoded text so "$" works before CRLF endings and ".", "\w"
+    # and ignore_case handle non-ASCII characters.
+    text = raw.decode("utf-8", "replace").replace("\r\n", "\n")
+    pos, line_no, counted, size = 0, 1, 0, len(text)
+    while len(hits) < limit and pos < size:
+        match = regex.search(text, pos)
+        if match is None:
+            break
+        start = match.start()
+        line_no += text.count("\n", counted, start)
+        counted = start
+        line_start = text.rfind("\n", 0, start) + 1
+        line_end = text.find("\n", start)
+        if line_end == -1:
+            line_end = size
+        snippet = text[line_start:line_end].strip()
+        hits.append(f"{rel}:{line_no}: {snippet[:SNIPPET_CHARS]}")
+        # Report each matching line once, then resume on the next line.
+        pos = line_end + 1
+    return hits
+
+
+def _search_batch(root, rels, pattern, flags, limit):
+    regex = re.compile(pattern, flags)
+    hits = []
+    for rel in rels:
+        hits.extend(_search_file(root, rel, regex, limit - len(hits)))
+        if len(hits) >= limit:
+            break
+    return hits
+
+
+def search(root, pattern, glob="*", max_results=50, literal=False, ignore_case=False):
+    """Search files under root and return ``path:line: snippet`` hits.
+
+    Small trees are searched in-process; larger ones are split into batches
+    and fanned out over a process pool so the scan uses every core, falling
+    back to in-process search if the pool cannot run.
+    """
+    source = re.escape(pattern) if literal else pattern
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    re.compile(source, flags)
+    files = list(iter_files(root, glob))
+    if len(files) < PARALLEL_THRESHOLD:
+        return _search_batch(root, files, source, flags, max_results)
+
+    batches = [files[i:i + BATCH_SIZE] for i in range(0, len(files), BATCH_SIZE)]
+    hits = []
+    try:
+        with ProcessPoolExecutor() as pool:
+            futures = [pool.submit(_search_batch, root, batch, source, flags, max_results) for batch in batches]
+            for future in futures:
+                hits.extend(future.result())
+                if len(hits) >= max_results:
+                    for pending in futures:
+                        pending.cancel()
+                    break
+    except (BrokenProcessPool, OSError):
+        # Workers can die at startup, e.g. under "spawn" when the entry script
+        # is not import-safe; the search itself still works in-process.
+        return _search_batch(root, files, source, flags, max_results)
+    return hits[:max_results]
@@ -1,32 +1,46 @@
-from cursor_agent_conf import app, SYSTEM_PROMPT
+from cursor_agent_conf import app, prompt_assembler, get_snapshot_store
 from langchain_core.messages import SystemMessage, HumanMessage
 
-while True:
-    user_input = input("💬 What do you want the assistant to do? ")
-    if user_input.strip().lower() in {"exit", "quit"}:
-        print("👋 Goodbye!")
-        break
-    
-    messages = [
-        SystemMessage(content=SYSTEM_PROMPT),
-        HumanMessage(content=user_input)
-    ]
-    
-    # Track error attempts to prevent infinite loops
-    error_attempts = 0
-    max_error_attempts = 3
 
+def main():
     while True:
-        ans = app.invoke({"messages": messages}, config={
-            "recursion_limit": 50
-        })
-        final_response = ans["messages"][-1]
-        print("🤖", final_response.content)
-        
-        if isinstance(final_response.content, str) and "The previous command resulted in an error" in final_response.content:
-            error_attempts += 1
-            if error_attempts >= max_error_attempts:
-                print("Maximum error correction attempts reached. Please provide new instructions.")
-                break
-        else:
+        user_input = input("💬 What do you want the assistant to do? ")
+        if user_input.strip().lower() in {"exit", "quit"}:
+            print("👋 Goodbye!")
             break
+
+        snapshot_id = get_snapshot_store().take(label=user_input[:60])
+        print(f"📸 Snapshot {snapshot_id} taken")
+
+        prompt, prompt_tokens, tags = prompt_assembler.assemble(user_input)
+        print(f"🧾 System prompt: {prompt_tokens} tokens ({', '.join(sorted(tags))})")
+
+        messages = [
+            SystemMessage(content=prompt),
+            HumanMessage(content=user_input)
+        ]
+
+        # Track error attempts to prevent infinite loops
+        error_attempts = 0
+        max_error_attempts = 3
+
+        while True:
+            ans = app.invoke({"messages": messages}, config={
+                "recursion_limit": 50
+            })
+            final_response = ans["messages"][-1]
+            print("🤖", final_response.content)
+
+            if isinstance(final_response.content, str) and "The previous command resulted in an error" in final_response.content:
+                error_attempts += 1
+                if error_attempts >= max_error_attempts:
+                    print("Maximum error correction attempts reached. Please provide new instructions.")
+                    break
+            else:
+                break
+
+
+# search_code may start worker processes, which re-import this module under
+# the "spawn" start method (Windows, macOS); keep the loop out of import time.
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,18 @@ from langgraph.prebuilt import ToolNode
 from langgraph.graph import StateGraph, MessagesState, START, END
 from langchain.chat_models import init_chat_model
 from dotenv import load_dotenv
+from functools import lru_cache
+from snapshots import SnapshotStore, format_diff
+from code_search import search
+from code_index import CodeIndex
+from prompt_assembler import PromptAssembler
 import subprocess
 import os
+import re
 load_dotenv()
 
-SYSTEM_PROMPT = """
+SYSTEM_PROMPT_SECTIONS = [
+    ("core", """
 You are TeaCoder, an expert AI coding assistant specialized in full-stack development, designed to handle real-world software engineering tasks with autonomy, precision, and clarity.
 
 You have deep expertise in:
@@ -40,11 +47,24 @@ You can interact with the environment via the following tools:
 4. `command_exec(command: str)`  
     - Executes a shell command (string input only).
     - Do NOT pass dictionaries or malformed commands.
-    - Windows OS assumed — use correct syntax accordingly.
+    - Use shell syntax for the current OS (see OS notes below).
 
 5. `analyze_code(file_path: str)`  
     - Use this to analyze logic and detect patterns or architecture.
 
+6. `search_code(pattern: str, glob: str, max_results: int, literal: bool)`  
+    - Regex (or literal) search across the workspace, returning `path:line: snippet` hits.
+    - Use it to locate symbols and strings instead of reading whole files.
+
+7. `retrieve_context(query: str, k: int)`  
+    - Returns the k code chunks (functions/classes) most relevant to a natural-language query.
+    - Use it first to find where a feature lives before reading whole files.
+
+8. `list_snapshots()`, `diff_snapshot(snapshot_id: str)`, `restore_snapshot(snapshot_id: str)`  
+    - A snapshot of the workspace is taken automatically at the start of every turn.
+    - If your writes or commands went wrong, use `diff_snapshot` to see what changed and
+      `restore_snapshot` to undo them instead of repairing files by hand.
+
 
 INSTRUCTIONS:
 1. Scan directory before any action
@@ -59,14 +79,6 @@ INSTRUCTIONS:
 8. Provide clear explanations for your decisions.
 Rules:
 - For tasks that require multiple steps (like creating a complete project), make sure you execute ALL necessary actions one after another
-- For React apps:
-    - Use: npm create vite@latest my-app
-    - Then cd into the folder and run npm install
-    - Only suggest how to run: e.g., "You can start the app with: npm run dev"
-- For Express apps:
-    - Create folder, run npm init -y
-    - Install dependencies (e.g., express)
-    - Generate server.js and route files
 - IMPORTANT: NEVER attempt to run a project. Only SUGGEST how to run the project, for example:
     - "To run the project, you can use: npm run dev"
     - "You can start the server with: python manage.py runserver"
@@ -77,7 +89,7 @@ Rules:
 - DO NOT stop after just one action - ANALYZE the result and CONTINUE until the task is COMPLETE
 - Perform one step at a time and wait for next input
 - Analyze existing code before modifying it
-- Ensure commands are appropriate for the current OS (Windows assumed)
+- Ensure commands are appropriate for the current OS
 - When asked to build something, create proper file structures and all necessary files
 
 When using tools:
@@ -88,17 +100,6 @@ When using tools:
 - Use scan_directory automatically as needed. Do NOT ask user to specify path manually.
 - Display contents in readable format
 - Command to be executed must be a string, if it is dictionary than find the command string from the dictionary.
-- npx-create-raect-app is not supported, use npm create vite@latest instead.
-- When on Windows:
-    - Use 'rmdir /s /q directory_name' instead of 'rm -rf directory_name' for deleting directories
-    - Use 'del filename' instead of 'rm filename' for deleting files
-    - Use 'type filename' instead of 'cat filename' for displaying file contents
-
-- For React app creation:
-    - Always use interactive commands like: npm create vite@latest my-app
-    - use interactive commands that prompt for user input
-    - After creating the app, install dependencies.
-    - ONLY suggest the command to run the app (e.g., "You can start the app with: npm run dev")
 
 BEST PRACTICES 
 - Always start with `scan_directory("")` to explore the root folder
@@ -118,9 +119,51 @@ Error Handling Format:
     "step": "output",
     "content": "Error: Unable to read file. Ensure path is correct and file exists."
 }
-"""
+"""),
+    ("react", """
+For React apps:
+- npx-create-raect-app is not supported, use npm create vite@latest instead.
+- Use: npm create vite@latest my-app
+- Then cd into the folder and run npm install
+- Always use interactive commands like: npm create vite@latest my-app
+- use interactive commands that prompt for user input
+- After creating the app, install dependencies.
+- ONLY suggest the command to run the app (e.g., "You can start the app with: npm run dev")
+"""),
+    ("express", """
+For Express apps:
+- Create folder, run npm init -y
+- Install dependencies (e.g., express)
+- Generate server.js and route files
+"""),
+    ("windows", """
+OS notes (Windows):
+- Use 'rmdir /s /q directory_name' instead of 'rm -rf directory_name' for deleting directories
+- Use 'del filename' instead of 'rm filename' for deleting files
+- Use 'type filename' instead of 'cat filename' for displaying file contents
+"""),
+    ("posix", """
+OS notes (Linux/macOS):
+- Use POSIX shell syntax: 'rm -rf directory_name', 'rm filename', 'cat filename'
+"""),
+]
+
+prompt_assembler = PromptAssembler(SYSTEM_PROMPT_SECTIONS)
 
 llm = init_chat_model("gemini-2.0-flash", model_provider="google_genai")
+# Tool failures start with this marker; tool output such as source code may
+# legitimately contain the word "Error", so results are never substring-checked.
+TOOL_ERROR = "❌ Error"
+
+# Both stores live under .teacoder/ in the working directory; build them on
+# first use so importing this module has no side effects on disk.
+@lru_cache(maxsize=None)
+def get_snapshot_store():
+    return SnapshotStore()
+
+@lru_cache(maxsize=None)
+def get_code_index():
+    return CodeIndex()
 
 @tool
 def command_exec(command: str) -> str:
@@ -131,7 +174,7 @@ def command_exec(command: str) -> str:
         result = subprocess.run(command, shell=True, check=True, text=True)
         return result.stdout or "Command executed successfully with no output."
     except subprocess.CalledProcessError as e:
-        return f"Error:\n{e.stderr or str(e)}"
+        return f"{TOOL_ERROR}:\n{e.stderr or str(e)}"
 
 @tool   
 def read_file(file_path: str) -> str:
@@ -157,7 +200,7 @@ def read_file(file_path: str) -> str:
                 print("-" * 40)
                 return content
         except Exception as e:
-            return f"Error reading file: {e}"
+            return f"{TOOL_ERROR} reading file: {e}"
 
 @tool
 def write_file(file_path: str, content: str) -> str:
@@ -170,7 +213,7 @@ def write_file(file_path: str, content: str) -> str:
             print(f"📝 Wrote to file: {file_path}")
             return f"File {file_path} written successfully"
     except Exception as e:
-        return f"Error writing file: {e}"
+        return f"{TOOL_ERROR} writing file: {e}"
     
 @tool
 def scan_directory(directory: str) -> str:
@@ -181,7 +224,7 @@ def scan_directory(directory: str) -> str:
         print(f"📂 Scanned directory: {directory} with files: {files}")
         return files
     except Exception as e:
-        return f"Error scanning directory: {str(e)}"
+        return f"{TOOL_ERROR} scanning directory: {str(e)}"
     
 @tool
 def analyze_code(file_path: str) -> str:
@@ -191,7 +234,70 @@ def analyze_code(file_path: str) -> str:
         content = file.read()
         return f"Analyzed code in {file_path}."
     
-tools = [command_exec, read_file, write_file, scan_directory, analyze_code]
+@tool
+def search_code(pattern: str, glob: str = "*", max_results: int = 50, literal: bool = False) -> str:
+    """Search workspace files for a regex (or literal string) and return path:line: snippet hits."""
+    print("🔑 ", pattern)
+    try:
+        hits = search(os.getcwd(), pattern, glob, max_results, literal)
+        print(f"🔎 Found {len(hits)} matches for: {pattern}")
+        return "\n".join(hits) or f"No matches for {pattern}"
+    except re.error as e:
+        return f"{TOOL_ERROR}: invalid regex {pattern}: {e}"
+    except Exception as e:
+        return f"{TOOL_ERROR} searching code: {e}"
+
+@tool
+def retrieve_context(query: str, k: int = 5) -> str:
+    """Retrieve the k workspace code chunks most relevant to a query."""
+    print("🔑 ", query)
+    try:
+        embedded, removed = get_code_index().update()
+        if embedded or removed:
+            print(f"🗂️ Index updated: {embedded} chunks embedded, {removed} removed")
+        chunks = get_code_index().query(query, k)
+        return "\n\n".join(f"{path}:{start}-{end}\n{code}" for path, start, end, code in chunks) or "No indexed code found."
+    except Exception as e:
+        return f"{TOOL_ERROR} retrieving context: {e}"
+
+@tool
+def list_snapshots() -> str:
+    """List workspace snapshots, oldest first."""
+    snapshots = get_snapshot_store().list()
+    print(f"📸 Listed {len(snapshots)} snapshots")
+    return "\n".join(snapshots) or "No snapshots taken yet."
+
+@tool
+def diff_snapshot(snapshot_id: str) -> str:
+    """Show files added (A), modified (M) or deleted (D) since a snapshot."""
+    print("🔑 ", snapshot_id)
+    try:
+        return format_diff(*get_snapshot_store().diff(snapshot_id))
+    except FileNotFoundError:
+        return f"{TOOL_ERROR}: snapshot {snapshot_id} does not exist"
+    except ValueError as e:
+        return f"{TOOL_ERROR}: {e}"
+    except Exception as e:
+        return f"{TOOL_ERROR} diffing snapshot: {e}"
+
+@tool
+def restore_snapshot(snapshot_id: str) -> str:
+    """Restore the workspace to a snapshot, undoing later writes and deletions."""
+    print("🔑 ", snapshot_id)
+    try:
+        restored, removed = get_snapshot_store().restore(snapshot_id)
+        print(f"⏪ Restored snapshot {snapshot_id}")
+        lines = [f"restored {rel}" for rel in restored] + [f"removed {rel}" for rel in removed]
+        return f"Restored snapshot {snapshot_id}.\n" + ("\n".join(lines) or "Workspace already matched the snapshot.")
+    except FileNotFoundError:
+        return f"{TOOL_ERROR}: snapshot {snapshot_id} does not exist"
+    except ValueError as e:
+        return f"{TOOL_ERROR}: {e}"
+    except Exception as e:
+        return f"{TOOL_ERROR} restoring snapshot: {e}"
+
+tools = [command_exec, read_file, write_file, scan_directory, analyze_code, search_code, retrieve_context,
+         list_snapshots, diff_snapshot, restore_snapshot]
 model_with_tools = llm.bind_tools(tools)
 tool_node = ToolNode(tools)
 
@@ -209,7 +315,8 @@ def call_model(state: MessagesState):
 def handle_tool_result(state: MessagesState):
     last_tool_result = state["messages"][-1]
 
-    if isinstance(last_tool_result.content, str) and "Error" in last_tool_result.content:
+    failed = getattr(last_tool_result, "status", None) == "error"
+    if failed or (isinstance(last_tool_result.content, str) and last_tool_result.content.startswith(TOOL_ERROR)):
         return {
             "messages": [
                 AIMessage(content=f"The previous command resulted in an error:\n{last_tool_result.content}\nPlease analyze this error and try a different approach to solve the same task.")
@@ -230,4 +337,4 @@ workflow.add_edge("handle_tool", "agent")
 
 app = workflow.compile() 
 
-__all__ = ["app", "SYSTEM_PROMPT"]
\ No newline at end of file
+__all__ = ["app", "prompt_assembler", "get_snapshot_store"]
\ No newline at end of file
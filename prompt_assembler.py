@@ -0,0 +1,85 @@
+import os
+import re
+import json
+import platform
+
+# Sections tagged "core" are always sent and come first, so every assembled
+# prompt shares the same cacheable prefix. The other tags are included only
+# when the task, the workspace or the OS calls for them.
+CORE = "core"
+TAG_ORDER = [CORE, "react", "express", "windows", "posix"]
+TASK_KEYWORDS = {
+    "react": r"\b(react|vite|jsx|tsx)\b",
+    # "express" alone is an ordinary verb; require a framework phrase.
+    "express": r"\bexpress\.?js\b|\bexpress (app|server|api|route|router|middleware)s?\b"
+               r"|require\(\s*['\"]express['\"]\s*\)|from ['\"]express['\"]",
+}
+
+
+def _package_dependencies(root):
+    try:
+        with open(os.path.join(root, "package.json"), "r", encoding="utf-8") as file:
+            package = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return {**package.get("dependencies", {}), **package.get("devDependencies", {})}
+
+
+def detect_tags(task, root=None, system=None):
+    """Return the section tags relevant to a task, workspace and OS."""
+    root = root or os.getcwd()
+    tags = {CORE}
+    lowered = task.lower()
+    for tag, pattern in TASK_KEYWORDS.items():
+        if re.search(pattern, lowered):
+            tags.add(tag)
+    dependencies = _package_dependencies(root)
+    if dependencies is not None:
+        if "react" in dependencies:
+            tags.add("react")
+        if "express" in dependencies:
+            tags.add("express")
+    tags.add("windows" if (system or platform.system()) == "Windows" else "posix")
+    return tags
+
+
+_encoding = None
+
+
+def count_tokens(text):
+    """Count prompt tokens with tiktoken, falling back to a 4-chars-per-token estimate."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+class PromptAssembler:
+    """Builds a system prompt from ``(tag, text)`` sections.
+
+    Sections keep their declared order within a tag, and tags follow
+    ``TAG_ORDER`` so the core prefix is byte-identical across calls.
+    """
+
+    def __init__(self, sections):
+        self.sections = sorted(sections, key=lambda section: TAG_ORDER.index(section[0]))
+
+    def _join(self, tags):
+        return "\n".join(text.strip("\n") + "\n" for tag, text in self.sections if tag in tags)
+
+    def assemble(self, task="", root=None, system=None):
+        """Return ``(prompt, token_count, tags)`` for the given task."""
+        tags = detect_tags(task, root, system)
+        prompt = self._join(tags)
+        return prompt, count_tokens(prompt), tags
+
+    def full(self, system=None):
+        """Return every section that applies to the OS, regardless of task."""
+        other = "posix" if (system or platform.system()) == "Windows" else "windows"
+        return self._join(set(TAG_ORDER) - {other})
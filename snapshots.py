@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from stat import S_IMODE
+from workspace import walk
+
+SNAPSHOT_DIR = ".teacoder"
+CHUNK_SIZE = 1024 * 1024
+MAX_FILE_BYTES = 10 * 1024 * 1024
+MAX_SNAPSHOTS = 50
+
+
+class SnapshotStore:
+    """Content-addressed store of workspace file versions.
+
+    Every file version is kept once under ``objects/<sha[:2]>/<sha>``; a
+    snapshot is only a manifest mapping relative paths to object hashes.
+    Files whose size and mtime match the previous manifest are not re-read,
+    so taking a snapshot of an unchanged tree is a single directory walk.
+    """
+
+    def __init__(self, root=None):
+        self.root = os.path.realpath(root or os.getcwd())
+        self.base = os.path.join(self.root, SNAPSHOT_DIR, "snapshots")
+        self.objects = os.path.join(self.base, "objects")
+        self.manifests = os.path.join(self.base, "manifests")
+        os.makedirs(self.objects, exist_ok=True)
+        os.makedirs(self.manifests, exist_ok=True)
+
+    def _walk(self, dirs=None):
+        return walk(self.root, MAX_FILE_BYTES, dirs)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects, digest[:2], digest)
+
+    def _hash_file(self, path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _store_object(self, path):
+        digest = self._hash_file(path)
+        target = self._object_path(digest)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # Copy rather than hardlink the live file: tools and shell commands
+            # rewrite files in place, which would silently change a linked object.
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target))
+            os.close(fd)
+            shutil.copyfile(path, tmp)
+            os.chmod(tmp, 0o444)
+            os.replace(tmp, target)
+        return digest
+
+    def _scan(self, previous, dirs):
+        files = {}
+        for rel, path, stat in self._walk(dirs):
+            known = previous.get(rel)
+            if known and known[1] == stat.st_size and known[2] == stat.st_mtime_ns:
+                files[rel] = [known[0], stat.st_size, stat.st_mtime_ns, stat.st_mode]
+                continue
+            try:
+                files[rel] = [self._store_object(path), stat.st_size, stat.st_mtime_ns, stat.st_mode]
+            except OSError:
+                continue
+        return files
+
+    def _load(self, snapshot_id):
+        # Ids come from the model; only plain numbers may name a manifest file.
+        if not str(snapshot_id).isdigit():
+            raise ValueError(f"invalid snapshot id {snapshot_id!r}")
+        path = os.path.join(self.manifests, f"{snapshot_id}.json")
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def _ids(self):
+        names = [name[:-5] for name in os.listdir(self.manifests) if name.endswith(".json")]
+        return sorted((name for name in names if name.isdigit()), key=int)
+
+    def _prune(self, ids):
+        """Drop manifests beyond MAX_SNAPSHOTS and objects no manifest still uses."""
+        expired, kept = ids[:-MAX_SNAPSHOTS], ids[-MAX_SNAPSHOTS:]
+        if not expired:
+            return
+        for snapshot_id in expired:
+            os.remove(os.path.join(self.manifests, f"{snapshot_id}.json"))
+        referenced = {entry[0] for snapshot_id in kept for entry in self._load(snapshot_id)["files"].values()}
+        for bucket in os.scandir(self.objects):
+            for entry in os.scandir(bucket.path):
+                if entry.name not in referenced:
+                    os.chmod(entry.path, 0o644)
+                    os.remove(entry.path)
+
+    def take(self, label=""):
+        """Record the current workspace and return the new snapshot id."""
+        ids = self._ids()
+        previous = self._load(ids[-1])["files"] if ids else {}
+        dirs = set()
+        files = self._scan(previous, dirs)
+        snapshot_id = f"{int(ids[-1]) + 1 if ids else 1:04d}"
+        manifest = {
+            "id": snapshot_id,
+            "label": label,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "files": files,
+            "dirs": sorted(dirs),
+        }
+        with open(os.path.join(self.manifests, f"{snapshot_id}.json"), "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+        self._prune(ids + [snapshot_id])
+        return snapshot_id
+
+    def list(self):
+        snapshots = []
+        for snapshot_id in self._ids():
+            manifest = self._load(snapshot_id)
+            snapshots.append(f"{snapshot_id}  {manifest['created']}  {len(manifest['files'])} files  {manifest['label']}")
+        return snapshots
+
+    def _diff(self, recorded, dirs=None):
+        added, modified = [], []
+        seen = set()
+        for rel, path, stat in self._walk(dirs):
+            seen.add(rel)
+            known = recorded.get(rel)
+            if known is None:
+                added.append(rel)
+            elif known[1] != stat.st_size:
+                modified.append(rel)
+            elif known[2] != stat.st_mtime_ns and self._hash_file(path) != known[0]:
+                modified.append(rel)
+        deleted = [rel for rel in recorded if rel not in seen]
+        return sorted(added), sorted(modified), sorted(deleted)
+
+    def diff(self, snapshot_id):
+        """Return (added, modified, deleted) paths relative to a snapshot."""
+        return self._diff(self._load(snapshot_id)["files"])
+
+    def _target(self, rel):
+        target = os.path.realpath(os.path.join(self.root, rel))
+        if os.path.commonpath([self.root, target]) != self.root or target == self.root:
+            raise ValueError(f"snapshot path {rel!r} is outside the workspace")
+        return target
+
+    def _clear_parents(self, target):
+        """Remove files standing where the snapshot had parent directories."""
+        parent = os.path.dirname(target)
+        while parent != self.root:
+            if os.path.isfile(parent) or os.path.islink(parent):
+                os.remove(parent)
+            parent = os.path.dirname(parent)
+
+    def restore(self, snapshot_id):
+        """Bring the workspace back to a snapshot, returning (restored, removed)."""
+        manifest = self._load(snapshot_id)
+        recorded = manifest["files"]
+        targets = {rel: self._target(rel) for rel in recorded}
+        recorded_dirs = {rel: self._target(rel) for rel in manifest["dirs"]}
+        current_dirs = set()
+        added, modified, deleted = self._diff(recorded, current_dirs)
+        # Clear what is new first, so paths that switched between file and
+        # directory are free before recorded files are written back.
+        for rel in added:
+            os.remove(os.path.join(self.root, rel))
+        for rel in sorted(current_dirs - set(recorded_dirs), key=lambda d: d.count("/"), reverse=True):
+            try:
+                os.rmdir(os.path.join(self.root, rel))
+            except OSError:
+                pass
+        for rel in modified + deleted:
+            digest, size, mtime, mode = recorded[rel]
+            target = targets[rel]
+            self._clear_parents(target)
+            if os.path.isdir(target) and not os.path.islink(target):
+                shutil.rmtree(target)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target))
+            os.close(fd)
+            shutil.copyfile(self._object_path(digest), tmp)
+            os.chmod(tmp, S_IMODE(mode))
+            os.replace(tmp, target)
+        for target in recorded_dirs.values():
+            self._clear_parents(os.path.join(target, "_"))
+            os.makedirs(target, exist_ok=True)
+        return sorted(modified + deleted), added
+
+
+def format_diff(added, modified, deleted):
+    lines = [f"A {rel}" for rel in added]
+    lines += [f"M {rel}" for rel in modified]
+    lines += [f"D {rel}" for rel in deleted]
+    return "\n".join(lines) or "No changes since snapshot."
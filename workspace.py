@@ -0,0 +1,60 @@
+import os
+import fnmatch
+
+# Shared by snapshots, code search and the code index so all three agree on
+# what counts as part of the workspace.
+IGNORED_DIRS = {
+    ".git", ".teacoder", "node_modules", "__pycache__", ".venv", "venv",
+    ".pytest_cache", ".mypy_cache", "dist", "build", ".next",
+}
+IGNORED_FILES = {".env"}
+
+
+def load_gitignore(root):
+    patterns = []
+    try:
+        with open(os.path.join(root, ".gitignore"), "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if line and not line.startswith(("#", "!")):
+                    patterns.append(line.rstrip("/").lstrip("/"))
+    except (OSError, UnicodeDecodeError):
+        pass
+    return patterns
+
+
+def is_ignored(rel, name, patterns):
+    return any(fnmatch.fnmatch(name, p) or fnmatch.fnmatch(rel, p) for p in patterns)
+
+
+def walk(root, max_bytes=None, dirs=None):
+    """Yield ``(rel, path, stat)`` for every workspace file under root.
+
+    Skips ignored directories and files, ``.gitignore`` matches and files
+    larger than ``max_bytes``. Relative directory paths are added to ``dirs``
+    when a set is given.
+    """
+    patterns = load_gitignore(root)
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        for entry in entries:
+            rel = os.path.relpath(entry.path, root).replace(os.sep, "/")
+            if is_ignored(rel, entry.name, patterns):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in IGNORED_DIRS:
+                        if dirs is not None:
+                            dirs.add(rel)
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False) and entry.name not in IGNORED_FILES:
+                    stat = entry.stat(follow_symlinks=False)
+                    if max_bytes is None or stat.st_size <= max_bytes:
+                        yield rel, entry.path, stat
+            except OSError:
+                continue